@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
-import json, os, re, time, subprocess, requests, threading
+import asyncio, functools, hashlib, os, re, stat, tempfile, threading, time, subprocess, requests
+import orjson
+from contextlib import asynccontextmanager
 from urllib.parse import urlencode, quote_plus, unquote
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, HTTPException, Response
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 # Percorsi e costanti
@@ -15,6 +18,7 @@ DOMAIN = os.environ.get('DOMAIN', 'melatv0bug.duckdns.org')
 M3U8_GENERATOR = os.path.join(BASE_DIR, 'm3u8_vavoo.py')
 CHIAVE_SCRIPT = os.path.join(BASE_DIR, 'chiave.py')
 M3U8_FILE = os.path.join(BASE_DIR, 'channels.m3u8')
+M3U8_GENERATOR_TIMEOUT = 300
 DEFAULT_MF_URL = os.environ.get('MEDIAFLOW_DEFAULT_URL', '')
 DEFAULT_MF_PSW = os.environ.get('MEDIAFLOW_DEFAULT_PSW', '')
 
@@ -30,37 +34,90 @@ CATEGORY_KEYWORDS_FILE = os.path.join(BASE_DIR, 'category_keywords.json')
 os.makedirs(os.path.join(BASE_DIR, "templates"), exist_ok=True)
 os.makedirs(os.path.join(BASE_DIR, "static"), exist_ok=True)
 
+# Espressioni regolari precompilate
+_TAIL_RE = re.compile(r'\s\.[A-Za-z]$')
+_TVG_ID_RE = re.compile(r'tvg-id="([^"]+)"')
+_NAME_RE = re.compile(r',([^\n]+)$')
+_GROUP_TITLE_RE = re.compile(r'group-title="([^"]+)"')
+_TVG_LOGO_RE = re.compile(r'tvg-logo="([^"]+)"')
+
+# Aggiornamento periodico dei canali per tutta la vita dell'applicazione
+@asynccontextmanager
+async def lifespan(app):
+    refresh_task = asyncio.create_task(refresh_channels_periodically())
+    yield
+    refresh_task.cancel()
+    try:
+        await refresh_task
+    except asyncio.CancelledError:
+        pass
+
 # Inizializzazione FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
 # Variabili cache
 channels_data_cache = []
 channels_data_timestamp = 0
+# Evita che più richieste concorrenti rigenerino la lista nello stesso momento
+channels_data_lock = threading.Lock()
+# Umask del processo, letta una sola volta all'avvio per i permessi dei file salvati
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+# Meta dei canali e indici, ricostruiti quando cambia channels_data_cache
+channel_cache = {"source": None, "all": [], "by_genre": {}, "name_index": {}, "by_id": {}, "originals_by_id": {}, "etag": ""}
+# Cache dei file JSON: filename -> (st_mtime_ns, dati)
+_json_cache = {}
 
 def load_json_file(filename, default=None):
     try:
         if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as file:
-                return json.load(file)
+            mtime = os.stat(filename).st_mtime_ns
+            cached = _json_cache.get(filename)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(filename, 'rb') as file:
+                data = orjson.loads(file.read())
+            _json_cache[filename] = (mtime, data)
+            return data
     except Exception as e:
         print(f"Errore nel caricamento di {filename}: {e}")
     return default if default is not None else {}
 
-def save_json_file(filename, data):
+def save_json_file(filename, data, indent=True):
+    tmp_filename = None
     try:
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        content = orjson.dumps(data, option=option)
+        directory = os.path.dirname(filename)
+        os.makedirs(directory, exist_ok=True)
+        # Scrivi su un file temporaneo univoco e rinominalo, così chi legge non vede mai un file a metà
+        fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp")
+        # mkstemp crea il file con permessi 0600: mantieni quelli del file esistente o quelli di default
+        try:
+            mode = stat.S_IMODE(os.stat(filename).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_filename, filename)
+        _json_cache.pop(filename, None)
         return True
     except Exception as e:
         print(f"Errore nel salvataggio di {filename}: {e}")
+        if tmp_filename:
+            try:
+                os.unlink(tmp_filename)
+            except OSError:
+                pass
         return False
 
 def clean_channel_name(name):
-    if len(name) > 3 and re.match(r'\s\.[A-Za-z]', name[-3:]):
+    if len(name) > 3 and _TAIL_RE.search(name):
         return name[:-3]
     return name
 
@@ -80,8 +137,9 @@ def extract_url_params(request: Request):
 def get_category_keywords():
     return load_json_file(CATEGORY_KEYWORDS_FILE, {})
 
-def get_channel_category(channel_name):
-    category_keywords = get_category_keywords()
+def get_channel_category(channel_name, category_keywords=None):
+    if category_keywords is None:
+        category_keywords = get_category_keywords()
     if not category_keywords:
         return "ALTRI"
     channel_name_lower = channel_name.lower()
@@ -103,10 +161,11 @@ def get_vavoo_signature():
         print(f"Errore signature: {e}")
         return None
 
-def create_manifest(mf_url, mf_psw):
-    categories = get_category_keywords()
+# Il manifest dipende solo dall'URL MediaFlow e dalle categorie: il dict restituito è condiviso, non modificarlo
+@functools.lru_cache(maxsize=8)
+def create_manifest(mf_url, categories):
     catalogs = [{"type": "tv", "id": f"mediaflow-{category}", "name": f"MediaFlow - {category}", 
-               "extra": [{"name": "search", "isRequired": False}]} for category in categories.keys()]
+               "extra": [{"name": "search", "isRequired": False}]} for category in categories]
     return {
         "id": "org.mediaflow.iptv", "name": "MediaFlow IPTV", "version": "1.0.0",
         "description": f"Watch IPTV channels from MediaFlow service ({mf_url})",
@@ -121,7 +180,7 @@ def generate_m3u8_list():
         if not os.path.exists(M3U8_GENERATOR):
             print(f"ERRORE: Script {M3U8_GENERATOR} non trovato!")
             return False
-        result = subprocess.run(['python3', M3U8_GENERATOR], capture_output=True, text=True)
+        result = subprocess.run(['python3', M3U8_GENERATOR], capture_output=True, text=True, timeout=M3U8_GENERATOR_TIMEOUT)
         if result.returncode == 0 and os.path.exists(M3U8_FILE):
             print(f"Lista M3U8 generata. Dimensione: {os.path.getsize(M3U8_FILE)} bytes")
             return True
@@ -141,21 +200,24 @@ def parse_m3u8_to_channels():
         with open(M3U8_FILE, 'r', encoding='utf-8') as f:
             lines = f.readlines()
         
+        category_keywords = get_category_keywords()
         channel, headers, sig_placeholder = None, {}, None
         for line in lines:
             line = line.strip()
             if line.startswith('#EXTINF:'):
                 channel = {}
-                tvg_id_match = re.search(r'tvg-id="([^"]+)"', line)
-                channel['id'] = tvg_id_match.group(1).replace(' ', '-').lower() if tvg_id_match else f"channel-{len(channels)}"
-                
-                name_match = re.search(r',([^\n]+)$', line)
+                name_match = _NAME_RE.search(line)
                 channel['name'] = name_match.group(1).strip() if name_match else f"Channel {len(channels)}"
                 
-                genre_match = re.search(r'group-title="([^"]+)"', line)
-                channel['genre'] = genre_match.group(1) if genre_match else get_channel_category(channel['name'])
+                # ID stabile tra un aggiornamento e l'altro anche senza tvg-id
+                tvg_id_match = _TVG_ID_RE.search(line)
+                channel['id'] = tvg_id_match.group(1).replace(' ', '-').lower() if tvg_id_match else \
+                    f"channel-{hashlib.blake2b(channel['name'].encode(), digest_size=6).hexdigest()}"
+                
+                genre_match = _GROUP_TITLE_RE.search(line)
+                channel['genre'] = genre_match.group(1) if genre_match else get_channel_category(channel['name'], category_keywords)
                 
-                logo_match = re.search(r'tvg-logo="([^"]+)"', line)
+                logo_match = _TVG_LOGO_RE.search(line)
                 channel['logo'] = logo_match.group(1) if logo_match else ""
                 
                 headers, sig_placeholder = {}, None
@@ -176,7 +238,7 @@ def parse_m3u8_to_channels():
                 channel = None
         
         if channels:
-            save_json_file(CHANNELS_FILE, channels)
+            save_json_file(CHANNELS_FILE, channels, indent=False)
         return channels
     except Exception as e:
         print(f"Errore analisi M3U8: {e}")
@@ -184,16 +246,18 @@ def parse_m3u8_to_channels():
 
 def get_channels_data():
     global channels_data_cache, channels_data_timestamp
-    current_time = time.time()
     
-    if not channels_data_cache or (current_time - channels_data_timestamp) > 3600:
-        channels = load_json_file(CHANNELS_FILE, [])
-        if not channels:
-            channels = parse_m3u8_to_channels()
-        
-        if channels:
-            channels_data_cache = channels
-            channels_data_timestamp = current_time
+    if not channels_data_cache or (time.time() - channels_data_timestamp) > 3600:
+        with channels_data_lock:
+            current_time = time.time()
+            if not channels_data_cache or (current_time - channels_data_timestamp) > 3600:
+                channels = load_json_file(CHANNELS_FILE, [])
+                if not channels:
+                    channels = parse_m3u8_to_channels()
+                
+                if channels:
+                    channels_data_cache = channels
+                    channels_data_timestamp = current_time
     
     return channels_data_cache
 
@@ -208,6 +272,19 @@ def to_meta(channel, mf_url, mf_psw):
         "background": logo, "logo": logo
     }
 
+@functools.lru_cache(maxsize=32)
+def encode_mediaflow_headers(header_items):
+    # Gli header sono gli stessi per quasi tutti i canali: codificali una volta sola
+    return urlencode([(f"h_{key}", value) for key, value in header_items], quote_via=quote_plus)
+
+def build_mediaflow_url(mf_url, mf_psw, stream_url, headers, signature=None):
+    query = [urlencode({"api_password": mf_psw, "d": stream_url}, quote_via=quote_plus)]
+    if headers:
+        query.append(encode_mediaflow_headers(tuple(headers.items())))
+    if signature:
+        query.append(f"h_mediahubmx-signature={quote_plus(signature)}")
+    return f"https://{mf_url}/proxy/hls/manifest.m3u8?{'&'.join(query)}"
+
 def resolve_stream_url(channel, mf_url, mf_psw):
     channel_name = clean_channel_name(channel["name"])
     headers = channel.get("headers", {})
@@ -229,10 +306,10 @@ def resolve_stream_url(channel, mf_url, mf_psw):
                         )
                         if result.returncode == 0 and result.stdout.strip():
                             try:
-                                resolver_result = json.loads(result.stdout)
+                                resolver_result = orjson.loads(result.stdout)
                                 if resolver_result["success"] and resolver_result["resolved_url"]:
                                     resolved_url = resolver_result["resolved_url"]
-                            except json.JSONDecodeError:
+                            except orjson.JSONDecodeError:
                                 resolved_url = result.stdout.strip()
                 except Exception as e:
                     print(f"Errore resolver.py: {e}")
@@ -243,37 +320,11 @@ def resolve_stream_url(channel, mf_url, mf_psw):
             stremio_headers["mediahubmx-signature"] = signature
             stremio_headers["user-agent"] = "Mozilla/5.0 (Linux; Android 10; Nexus 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.101 Mobile Safari/537.36"
             
-            params = {
-                "api_password": mf_psw,
-                "d": resolved_url or stream_url
-            }
-            
-            for key, value in headers.items():
-                params[f"h_{key}"] = value
-            
-            params["h_mediahubmx-signature"] = signature
-            
-            mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?{urlencode(params, quote_via=quote_plus)}"
+            mf_url_final = build_mediaflow_url(mf_url, mf_psw, resolved_url or stream_url, headers, signature)
         else:
-            params = {
-                "api_password": mf_psw,
-                "d": stream_url
-            }
-            
-            for key, value in headers.items():
-                params[f"h_{key}"] = value
-            
-            mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?{urlencode(params, quote_via=quote_plus)}"
+            mf_url_final = build_mediaflow_url(mf_url, mf_psw, stream_url, headers)
     else:
-        params = {
-            "api_password": mf_psw,
-            "d": stream_url
-        }
-        
-        for key, value in headers.items():
-            params[f"h_{key}"] = value
-        
-        mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?{urlencode(params, quote_via=quote_plus)}"
+        mf_url_final = build_mediaflow_url(mf_url, mf_psw, stream_url, headers)
         stremio_headers = headers.copy()
         stremio_headers["user-agent"] = "Mozilla/5.0 (Linux; Android 10; Nexus 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.101 Mobile/15E148 Safari/537.36"
         resolved_url = stream_url
@@ -328,6 +379,9 @@ def get_all_channels(mf_url, mf_psw):
     
     try:
         channels_data = get_channels_data()
+        if channel_cache["source"] is channels_data:
+            return channel_cache["all"]
+        
         all_channels = []
         for channel in channels_data:
             try:
@@ -336,22 +390,94 @@ def get_all_channels(mf_url, mf_psw):
             except Exception as e:
                 print(f"Errore canale {channel.get('name', 'Unknown')}: {e}")
         
+        by_genre, name_index = {}, {}
+        for meta in all_channels:
+            genre = meta["genres"][0]
+            by_genre.setdefault(genre, []).append(meta)
+            name_index.setdefault(genre, []).append((meta["name"].lower(), meta))
+        
+        # A parità di ID vince il primo canale della lista
+        by_id = {meta["id"]: meta for meta in reversed(all_channels)}
+        originals_by_id = {f"mediaflow-{c['id']}": c for c in reversed(channels_data)}
+        
+        etag = f'W/"{hashlib.md5(str(channels_data_timestamp).encode()).hexdigest()}"'
+        
+        channel_cache.update(source=channels_data, all=all_channels, by_genre=by_genre, name_index=name_index,
+                             by_id=by_id, originals_by_id=originals_by_id, etag=etag)
         return all_channels
     except Exception as e:
         print(f"Errore in get_all_channels: {e}")
         return []
 
-def refresh_channels_periodically():
+def filter_channels(category, search=None):
+    if search:
+        search = search.lower()
+        return [c for name_lower, c in channel_cache["name_index"].get(category, []) if search in name_lower]
+    return channel_cache["by_genre"].get(category, [])
+
+async def generate_m3u8_list_async():
+    # Come generate_m3u8_list, ma il processo viene terminato se il task viene cancellato
+    if not os.path.exists(M3U8_GENERATOR):
+        print(f"ERRORE: Script {M3U8_GENERATOR} non trovato!")
+        return False
+    process = await asyncio.create_subprocess_exec(
+        'python3', M3U8_GENERATOR, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout=M3U8_GENERATOR_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"ERRORE generazione M3U8: timeout dopo {M3U8_GENERATOR_TIMEOUT} secondi")
+        return False
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+    if process.returncode == 0 and os.path.exists(M3U8_FILE):
+        print(f"Lista M3U8 generata. Dimensione: {os.path.getsize(M3U8_FILE)} bytes")
+        return True
+    print(f"ERRORE generazione M3U8: {stderr.decode(errors='replace')}")
+    return False
+
+async def refresh_channels():
+    global channels_data_cache, channels_data_timestamp
+    try:
+        if await generate_m3u8_list_async():
+            await asyncio.to_thread(parse_m3u8_to_channels)
+            channels_data_cache = []
+            channels_data_timestamp = 0
+    except Exception as e:
+        print(f"Errore aggiornamento canali: {e}")
+
+async def refresh_channels_periodically():
     while True:
-        try:
-            if generate_m3u8_list():
-                parse_m3u8_to_channels()
-                global channels_data_cache, channels_data_timestamp
-                channels_data_cache = []
-                channels_data_timestamp = 0
-        except Exception as e:
-            print(f"Errore aggiornamento canali: {e}")
-        time.sleep(20 * 60)
+        await refresh_channels()
+        await asyncio.sleep(20 * 60)
+
+def etag_matches(if_none_match, etag):
+    # Confronto debole: l'ETag vale sia per la risposta normale che per quella compressa dal GZipMiddleware
+    if not if_none_match:
+        return False
+    opaque_tag = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == opaque_tag:
+            return True
+    return False
+
+def cached_response(request: Request, content, etag):
+    # I dati cambiano solo all'aggiornamento della lista canali (ogni 20 minuti)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=1200"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content, headers=headers)
+
+@functools.lru_cache(maxsize=8)
+def manifest_etag(mf_url, categories):
+    return f'W/"{hashlib.md5(orjson.dumps(create_manifest(mf_url, categories))).hexdigest()}"'
+
+def manifest_response(request: Request, mf_url):
+    categories = tuple(get_category_keywords().keys())
+    return cached_response(request, create_manifest(mf_url, categories), manifest_etag(mf_url, categories))
 
 def create_index_template():
     template_path = os.path.join(BASE_DIR, "templates", "index.html")
@@ -399,33 +525,28 @@ async def status():
     }
 
 @app.get("/mfp/{url}/psw/{psw}/manifest.json")
-async def manifest_with_params(url: str, psw: str):
-    return create_manifest(url, psw)
+async def manifest_with_params(url: str, psw: str, request: Request):
+    return manifest_response(request, url)
 
 @app.get("/manifest.json")
 async def manifest(request: Request):
-    mf_url, mf_psw = extract_url_params(request)
-    return create_manifest(mf_url, mf_psw)
+    mf_url, _ = extract_url_params(request)
+    return manifest_response(request, mf_url)
 
 @app.get("/mfp/{url}/psw/{psw}/catalog/{type}/{id}/{search_param}.json")
-async def catalog_with_search_param(url: str, psw: str, type: str, id: str, search_param: str):
+async def catalog_with_search_param(url: str, psw: str, type: str, id: str, search_param: str, request: Request):
     if type != "tv" or not id.startswith("mediaflow-"):
         return {"metas": []}
     
     category = id.split("-")[1]
-    all_channels = get_all_channels(url, psw)
+    if not await asyncio.to_thread(get_all_channels, url, psw):
+        return {"metas": []}
     
     search = None
     if search_param and search_param.startswith("search="):
         search = unquote(search_param.split("=")[1])
     
-    if not search:
-        filtered_channels = [c for c in all_channels if c["genres"][0] == category]
-    else:
-        search = search.lower()
-        filtered_channels = [c for c in all_channels if search in c["name"].lower()]
-    
-    return {"metas": filtered_channels}
+    return cached_response(request, {"metas": filter_channels(category, search)}, channel_cache["etag"])
 
 @app.get("/mfp/{url}/psw/{psw}/catalog/{type}/{id}.json")
 async def catalog_with_params(url: str, psw: str, type: str, id: str, request: Request, genre: str = None, search: str = None):
@@ -433,15 +554,10 @@ async def catalog_with_params(url: str, psw: str, type: str, id: str, request: R
         return {"metas": []}
     
     category = id.split("-")[1]
-    all_channels = get_all_channels(url, psw)
-    
-    filtered_channels = [c for c in all_channels if c["genres"][0] == category]
-    
-    if search:
-        search = search.lower()
-        filtered_channels = [c for c in all_channels if search in c["name"].lower()]
+    if not await asyncio.to_thread(get_all_channels, url, psw):
+        return {"metas": []}
     
-    return {"metas": filtered_channels}
+    return cached_response(request, {"metas": filter_channels(category, search)}, channel_cache["etag"])
 
 @app.get("/catalog/{type}/{id}.json")
 async def catalog(type: str, id: str, request: Request, genre: str = None, search: str = None):
@@ -450,25 +566,21 @@ async def catalog(type: str, id: str, request: Request, genre: str = None, searc
     
     mf_url, mf_psw = extract_url_params(request)
     category = id.split("-")[1]
-    all_channels = get_all_channels(mf_url, mf_psw)
-    
-    filtered_channels = [c for c in all_channels if c["genres"][0] == category]
-    
-    if search:
-        search = search.lower()
-        filtered_channels = [c for c in all_channels if search in c["name"].lower()]
+    if not await asyncio.to_thread(get_all_channels, mf_url, mf_psw):
+        return {"metas": []}
     
-    return {"metas": filtered_channels}
+    return cached_response(request, {"metas": filter_channels(category, search)}, channel_cache["etag"])
 
 @app.get("/mfp/{url}/psw/{psw}/meta/{type}/{id}.json")
-async def meta_with_params(url: str, psw: str, type: str, id: str):
+async def meta_with_params(url: str, psw: str, type: str, id: str, request: Request):
     if type != "tv" or not id.startswith("mediaflow-"):
         return {"meta": {}}
     
-    all_channels = get_all_channels(url, psw)
-    channel = next((c for c in all_channels if c["id"] == id), None)
+    if not await asyncio.to_thread(get_all_channels, url, psw):
+        return {"meta": {}}
+    channel = channel_cache["by_id"].get(id)
     
-    return {"meta": channel} if channel else {"meta": {}}
+    return cached_response(request, {"meta": channel} if channel else {"meta": {}}, channel_cache["etag"])
 
 @app.get("/meta/{type}/{id}.json")
 async def meta(type: str, id: str, request: Request):
@@ -476,23 +588,24 @@ async def meta(type: str, id: str, request: Request):
         return {"meta": {}}
     
     mf_url, mf_psw = extract_url_params(request)
-    all_channels = get_all_channels(mf_url, mf_psw)
-    channel = next((c for c in all_channels if c["id"] == id), None)
+    if not await asyncio.to_thread(get_all_channels, mf_url, mf_psw):
+        return {"meta": {}}
+    channel = channel_cache["by_id"].get(id)
     
-    return {"meta": channel} if channel else {"meta": {}}
+    return cached_response(request, {"meta": channel} if channel else {"meta": {}}, channel_cache["etag"])
 
 @app.get("/mfp/{url}/psw/{psw}/stream/{type}/{id}.json")
 async def stream_with_params(url: str, psw: str, type: str, id: str):
     if type != "tv" or not id.startswith("mediaflow-"):
         return {"streams": []}
     
-    all_channels = get_all_channels(url, psw)
-    original_channel = next((c for c in channels_data_cache if f"mediaflow-{c['id']}" == id), None)
+    await asyncio.to_thread(get_all_channels, url, psw)
+    original_channel = channel_cache["originals_by_id"].get(id)
     
     if not original_channel:
         return {"streams": []}
     
-    stream_info = resolve_stream_url(original_channel, url, psw)
+    stream_info = await asyncio.to_thread(resolve_stream_url, original_channel, url, psw)
     
     return {"streams": stream_info}
 
@@ -502,12 +615,13 @@ async def stream(type: str, id: str, request: Request):
         return {"streams": []}
     
     mf_url, mf_psw = extract_url_params(request)
-    original_channel = next((c for c in channels_data_cache if f"mediaflow-{c['id']}" == id), None)
+    await asyncio.to_thread(get_all_channels, mf_url, mf_psw)
+    original_channel = channel_cache["originals_by_id"].get(id)
     
     if not original_channel:
         return {"streams": []}
     
-    stream_info = resolve_stream_url(original_channel, mf_url, mf_psw)
+    stream_info = await asyncio.to_thread(resolve_stream_url, original_channel, mf_url, mf_psw)
     
     return {"streams": stream_info}
 
@@ -518,7 +632,4 @@ if __name__ == "__main__":
     if generate_m3u8_list():
         channels = parse_m3u8_to_channels()
     
-    update_thread = threading.Thread(target=refresh_channels_periodically, daemon=True)
-    update_thread.start()
-    
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    uvicorn.run(app, host="0.0.0.0", port=PORT, loop="uvloop", http="httptools", log_level="warning", access_log=False)
@@ -6,6 +6,9 @@ import sys
 import re
 import os
 
+# Suffisso ".c"/".s" dei nomi canale
+_CS_RE = re.compile(r"\.[cs]$", re.IGNORECASE)
+
 def get_auth_signature():
     headers = {
         "user-agent": "okhttp/4.11.0",
@@ -87,7 +90,7 @@ def setup_logging():
     logging.basicConfig(filename="excluded_channels.log", level=logging.INFO, format="%(asctime)s - %(message)s")
 
 def sanitize_tvg_id(channel_name):
-    channel_name = re.sub(r"\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
+    channel_name = _CS_RE.sub("", channel_name).strip()
     return " ".join(word.capitalize() for word in channel_name.split())
 
 def load_config(filename):
@@ -109,7 +112,7 @@ def get_logo_url(channel_name, channel_logos):
         return logo_url
     
     # Genera URL placeholder se non esiste un logo
-    clean_name = re.sub(r"\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
+    clean_name = _CS_RE.sub("", channel_name).strip()
     # Rimuovi gli ultimi 3 caratteri come richiesto
     if len(clean_name) > 3:
         clean_name = clean_name[:-3]
@@ -129,35 +132,39 @@ def get_channel_list(signature, group="Italy"):
     cursor = 0
     all_items = []
 
-    while True:
-        data = {
-            "language": "de",
-            "region": "AT",
-            "catalogId": "vto-iptv",
-            "id": "vto-iptv",
-            "adult": False,
-            "search": "",
-            "sort": "name",
-            "filter": {"group": group},
-            "cursor": cursor,
-            "clientVersion": "3.0.2"
-        }
+    # Una sola sessione per riusare la connessione tra le pagine
+    with requests.Session() as session:
+        session.headers.update(headers)
+
+        while True:
+            data = {
+                "language": "de",
+                "region": "AT",
+                "catalogId": "vto-iptv",
+                "id": "vto-iptv",
+                "adult": False,
+                "search": "",
+                "sort": "name",
+                "filter": {"group": group},
+                "cursor": cursor,
+                "clientVersion": "3.0.2"
+            }
 
-        try:
-            response = requests.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+            try:
+                response = session.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data)
+                response.raise_for_status()
+                result = response.json()
 
-            items = result.get("items", [])
-            if not items:
-                break  # Se non ci sono più canali, esce dal ciclo
+                items = result.get("items", [])
+                if not items:
+                    break  # Se non ci sono più canali, esce dal ciclo
 
-            all_items.extend(items)
-            cursor += len(items)  # Aggiorna il cursore con il numero di canali ricevuti
+                all_items.extend(items)
+                cursor += len(items)  # Aggiorna il cursore con il numero di canali ricevuti
 
-        except Exception as e:
-            print(f"Errore durante il recupero della lista dei canali: {e}")
-            break
+            except Exception as e:
+                print(f"Errore durante il recupero della lista dei canali: {e}")
+                break
 
     return {"items": all_items}
 
@@ -173,10 +180,10 @@ def generate_m3u(channels_json, signature, channel_filters, channel_remove, cate
     with open(filename, "w", encoding="utf-8") as f:
         f.write('#EXTM3U url-tvg="http://epg-guide.com/it.gz"\n')
 
-        for idx, item in enumerate(items, 1):
+        for item in items:
             name = item.get("name", "Unknown")
             if any(remove_word.lower() in name.lower() for remove_word in channel_remove):
-                print(f"Skipping channel {name} (in CHANNEL_REMOVE)")
+                logging.info(f"Skipped channel: {name} (in CHANNEL_REMOVE)")
                 continue
 
             if not any(filter_word.lower() in name.lower() for filter_word in channel_filters):
@@ -189,8 +196,6 @@ def generate_m3u(channels_json, signature, channel_filters, channel_remove, cate
             if not original_link:
                 continue
 
-            print(f"Processing channel {idx}/{len(items)}: {name}")
-            
             # Non risolvere il link, usarlo direttamente
             category = get_category(name, category_keywords)
             logo_url = get_logo_url(name, channel_logos)
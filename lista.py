@@ -6,6 +6,11 @@ import logging
 import sys
 import re
 
+# Suffisso finale dei nomi canale (" .c", ".s", ...)
+_TAIL_RE = re.compile(r"[\s.][a-zA-Z]$")
+# Tabella per eliminare spazi e punti in un solo passaggio
+_STRIP_SPACES_DOTS = str.maketrans("", "", " .")
+
 # Carica configurazione generale e icone
 def load_config():
     with open("config.json", "r", encoding="utf-8") as f:
@@ -32,7 +37,7 @@ def setup_logging():
 
 # Funzione per pulire il nome del canale
 def sanitize_channel_name(name):
-    return re.sub(r"[\s.][a-zA-Z]$", "", name).replace(" ", "").replace(".", "")
+    return _TAIL_RE.sub("", name).translate(_STRIP_SPACES_DOTS)
 
 def get_category(channel_name):
     lower_name = channel_name.lower()
@@ -53,31 +58,35 @@ def get_channel_list(signature):
     cursor = 0
     all_items = []
 
-    while True:
-        data = {
-            "language": "de",
-            "region": "AT",
-            "catalogId": "vto-iptv",
-            "id": "vto-iptv",
-            "adult": False,
-            "search": "",
-            "sort": "name",
-            "filter": {"group": "Italy"},
-            "cursor": cursor,
-            "clientVersion": "3.0.2"
-        }
+    # Una sola sessione per riusare la connessione tra le pagine
+    with requests.Session() as session:
+        session.headers.update(headers)
+
+        while True:
+            data = {
+                "language": "de",
+                "region": "AT",
+                "catalogId": "vto-iptv",
+                "id": "vto-iptv",
+                "adult": False,
+                "search": "",
+                "sort": "name",
+                "filter": {"group": "Italy"},
+                "cursor": cursor,
+                "clientVersion": "3.0.2"
+            }
         
-        try:
-            response = requests.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data, headers=headers)
-            response.raise_for_status()
-            items = response.json().get("items", [])
-            if not items:
+            try:
+                response = session.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data)
+                response.raise_for_status()
+                items = response.json().get("items", [])
+                if not items:
+                    break
+                all_items.extend(items)
+                cursor += len(items)
+            except Exception as e:
+                print(f"Errore durante il recupero della lista dei canali: {e}")
                 break
-            all_items.extend(items)
-            cursor += len(items)
-        except Exception as e:
-            print(f"Errore durante il recupero della lista dei canali: {e}")
-            break
 
     return {"items": all_items}
 
@@ -94,11 +103,11 @@ def generate_m3u(channels_json, signature, filename="channels.m3u8"):
     with open(filename, "w", encoding="utf-8") as f:
         f.write('#EXTM3U url-tvg="http://epg-guide.com/it.gz"\n')
 
-        for idx, item in enumerate(items, 1):
+        for item in items:
             name = item.get("name", "Unknown")
 
             if any(remove_word.lower() in name.lower() for remove_word in config["channel_remove"]):
-                print(f"Skipping channel {name} (in CHANNEL_REMOVE)")
+                logging.info(f"Skipped channel: {name} (in CHANNEL_REMOVE)")
                 continue
 
             if not any(filter_word.lower() in name.lower() for filter_word in config["channel_filters"]):
@@ -111,8 +120,6 @@ def generate_m3u(channels_json, signature, filename="channels.m3u8"):
             if not original_link:
                 continue
 
-            print(f"Processing channel {idx}/{len(items)}: {name}")
-
             category = get_category(name)
             logo_url = icons.get(tvg_id.lower(), "")
 
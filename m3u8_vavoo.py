@@ -22,11 +22,15 @@ except ImportError:
             print(f"Errore durante l'esecuzione di chiave.py: {e}")
             return None
 
+# Suffissi ".c"/".s" dei nomi canale
+_CS_RE = re.compile(r"\.[cs]$", re.IGNORECASE)
+_SPACED_CS_RE = re.compile(r"\s+\.[cs]$", re.IGNORECASE)
+
 def setup_logging():
     logging.basicConfig(filename="excluded_channels.log", level=logging.INFO, format="%(asctime)s - %(message)s")
 
 def sanitize_tvg_id(channel_name):
-    channel_name = re.sub(r"\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
+    channel_name = _CS_RE.sub("", channel_name).strip()
     return " ".join(word.capitalize() for word in channel_name.split())
 
 def load_config(filename):
@@ -35,49 +39,48 @@ def load_config(filename):
             return json.load(f)
     return {}
 
-def get_category(channel_name, category_keywords):
+def compile_category_keywords(category_keywords):
+    # Una regex per categoria, nell'ordine del file: vince la prima categoria con una keyword presente
+    return [
+        (category, re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords)))
+        for category, keywords in category_keywords.items() if keywords
+    ]
+
+def get_category(channel_name, category_patterns):
     lower_name = channel_name.lower()
-    for category, keywords in category_keywords.items():
-        if any(keyword.lower() in lower_name for keyword in keywords):
+    for category, pattern in category_patterns:
+        if pattern.search(lower_name):
             return category
     return "ALTRI"
 
 def normalize_channel_name(channel_name):
     # Rimuovi solo il suffisso " .c" o " .s" (incluso lo spazio)
-    clean_name = re.sub(r"\s+\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
+    clean_name = _SPACED_CS_RE.sub("", channel_name).strip()
     return clean_name.lower()
 
-def get_logo_url(channel_name, channel_logos):
+def normalize_channel_logos(channel_logos):
+    # Normalizza le chiavi una sola volta; a parità di nome normalizzato vince la prima
+    normalized_logos = {}
+    for logo_channel, logo_url in channel_logos.items():
+        normalized_logos.setdefault(normalize_channel_name(logo_channel), logo_url)
+    return normalized_logos
+
+def get_logo_url(channel_name, normalized_logos):
     # Normalizza il nome del canale rimuovendo solo il suffisso " .c" o " .s"
     normalized_name = normalize_channel_name(channel_name)
     
-    print(f"DEBUG - Cercando logo per: '{channel_name}' → normalizzato a: '{normalized_name}'")
+    # Prova corrispondenza esatta
+    logo_url = normalized_logos.get(normalized_name)
+    if logo_url is not None:
+        return logo_url
     
-    # Cerca nel dizionario usando i nomi normalizzati
-    for logo_channel, logo_url in channel_logos.items():
-        normalized_logo_channel = normalize_channel_name(logo_channel)
-        
-        # Prova corrispondenza esatta
-        if normalized_name == normalized_logo_channel:
-            print(f"DEBUG - TROVATO! Corrispondenza esatta: '{normalized_name}' = '{normalized_logo_channel}'")
-            return logo_url
-        
-        # Prova corrispondenza parziale (se il nome logo è contenuto nel nome canale o viceversa)
+    # Prova corrispondenza parziale (se il nome logo è contenuto nel nome canale o viceversa)
+    for normalized_logo_channel, logo_url in normalized_logos.items():
         if normalized_name in normalized_logo_channel or normalized_logo_channel in normalized_name:
-            print(f"DEBUG - TROVATO! Corrispondenza parziale: '{normalized_name}' ↔ '{normalized_logo_channel}'")
             return logo_url
     
     # Genera URL placeholder se non esiste un logo
-    clean_name = re.sub(r"\s+\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
-    # Sostituisci spazi con + per l'URL
-    formatted_name = clean_name.replace(" ", "+")
-    return f"https://placehold.co/400x400?text={formatted_name}&.png"
-    
-    # Genera URL placeholder se non esiste un logo
-    clean_name = re.sub(r"\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
-    # Rimuovi gli ultimi 3 caratteri come richiesto
-    if len(clean_name) > 3:
-        clean_name = clean_name[:-3]
+    clean_name = _SPACED_CS_RE.sub("", channel_name).strip()
     # Sostituisci spazi con + per l'URL
     formatted_name = clean_name.replace(" ", "+")
     return f"https://placehold.co/400x400?text={formatted_name}&.png"
@@ -94,35 +97,39 @@ def get_channel_list(signature, group="Italy"):
     cursor = 0
     all_items = []
 
-    while True:
-        data = {
-            "language": "de",
-            "region": "AT",
-            "catalogId": "vto-iptv",
-            "id": "vto-iptv",
-            "adult": False,
-            "search": "",
-            "sort": "name",
-            "filter": {"group": group},
-            "cursor": cursor,
-            "clientVersion": "3.0.2"
-        }
-
-        try:
-            response = requests.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data, headers=headers)
-            response.raise_for_status()
-            result = response.json()
-
-            items = result.get("items", [])
-            if not items:
-                break  # Se non ci sono più canali, esce dal ciclo
-
-            all_items.extend(items)
-            cursor += len(items)  # Aggiorna il cursore con il numero di canali ricevuti
-
-        except Exception as e:
-            print(f"Errore durante il recupero della lista dei canali: {e}")
-            break
+    # Una sola sessione per riusare la connessione tra le pagine
+    with requests.Session() as session:
+        session.headers.update(headers)
+
+        while True:
+            data = {
+                "language": "de",
+                "region": "AT",
+                "catalogId": "vto-iptv",
+                "id": "vto-iptv",
+                "adult": False,
+                "search": "",
+                "sort": "name",
+                "filter": {"group": group},
+                "cursor": cursor,
+                "clientVersion": "3.0.2"
+            }
+
+            try:
+                response = session.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data)
+                response.raise_for_status()
+                result = response.json()
+
+                items = result.get("items", [])
+                if not items:
+                    break  # Se non ci sono più canali, esce dal ciclo
+
+                all_items.extend(items)
+                cursor += len(items)  # Aggiorna il cursore con il numero di canali ricevuti
+
+            except Exception as e:
+                print(f"Errore durante il recupero della lista dei canali: {e}")
+                break
 
     return {"items": all_items}
     
@@ -134,49 +141,51 @@ def generate_m3u(channels_json, signature, channel_filters, channel_remove, cate
         return
 
     print(f"Generating M3U8 file with {len(items)} channels...")
-    print(f"DEBUG - Numero di loghi disponibili: {len(channel_logos)}")
-    
-    # Mostra un campione dei loghi disponibili
-    sample_count = min(3, len(channel_logos))
-    print(f"DEBUG - Campione di {sample_count} loghi:")
-    sample_logos = list(channel_logos.items())[:sample_count]
-    for logo_key, logo_url in sample_logos:
-        print(f"DEBUG - '{logo_key}': '{logo_url}'")
+    logging.debug(f"Numero di loghi disponibili: {len(channel_logos)}")
 
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write('#EXTM3U url-tvg="http://epg-guide.com/it.gz"\n')
+    category_patterns = compile_category_keywords(category_keywords)
+    normalized_logos = normalize_channel_logos(channel_logos)
+    remove_words = [remove_word.lower() for remove_word in channel_remove]
+    filter_words = [filter_word.lower() for filter_word in channel_filters]
+
+    # Accumula le righe in memoria e scrivi il file in un colpo solo
+    lines = ['#EXTM3U url-tvg="http://epg-guide.com/it.gz"\n']
 
-        for idx, item in enumerate(items, 1):
-            name = item.get("name", "Unknown")
-            if any(remove_word.lower() in name.lower() for remove_word in channel_remove):
-                print(f"Skipping channel {name} (in CHANNEL_REMOVE)")
-                continue
+    for item in items:
+        name = item.get("name", "Unknown")
+        lower_name = name.lower()
+        if any(remove_word in lower_name for remove_word in remove_words):
+            logging.info(f"Skipped channel: {name} (in CHANNEL_REMOVE)")
+            continue
 
-            # Se channel_filters è vuoto, includi tutti i canali
-            # Altrimenti, includi solo quelli che corrispondono ai filtri
-            if channel_filters and not any(filter_word.lower() in name.lower() for filter_word in channel_filters):
-                logging.info(f"Excluded channel: {name}")
-                continue
+        # Se channel_filters è vuoto, includi tutti i canali
+        # Altrimenti, includi solo quelli che corrispondono ai filtri
+        if filter_words and not any(filter_word in lower_name for filter_word in filter_words):
+            logging.info(f"Excluded channel: {name}")
+            continue
 
-            tvg_id = sanitize_tvg_id(name)
-            original_link = item.get("url")
+        tvg_id = sanitize_tvg_id(name)
+        original_link = item.get("url")
 
-            if not original_link:
-                continue
+        if not original_link:
+            continue
 
-            print(f"Processing channel {idx}/{len(items)}: {name}")
-            
-            # Non risolvere il link, usarlo direttamente
-            category = get_category(name, category_keywords)
-            logo_url = get_logo_url(name, channel_logos)
+        # Non risolvere il link, usarlo direttamente
+        category = get_category(name, category_patterns)
+        logo_url = get_logo_url(name, normalized_logos)
 
-            f.write(f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-name="{tvg_id}" tvg-logo="{logo_url}" group-title="{category}",{tvg_id}\n')
+        lines.append(
+            f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-name="{tvg_id}" tvg-logo="{logo_url}" group-title="{category}",{tvg_id}\n'
             # Aggiungi header per il player
-            f.write('#EXTVLCOPT:http-user-agent=okhttp/4.11.0\n')
-            f.write('#EXTVLCOPT:http-origin=https://vavoo.to/\n')
-            f.write('#EXTVLCOPT:http-referrer=https://vavoo.to/\n')
-            f.write('#EXTVLCOPT:mediahubmx-signature=[$KEY$]\n')  # Placeholder per la chiave di firma
-            f.write(f'{original_link}\n')
+            '#EXTVLCOPT:http-user-agent=okhttp/4.11.0\n'
+            '#EXTVLCOPT:http-origin=https://vavoo.to/\n'
+            '#EXTVLCOPT:http-referrer=https://vavoo.to/\n'
+            '#EXTVLCOPT:mediahubmx-signature=[$KEY$]\n'  # Placeholder per la chiave di firma
+            f'{original_link}\n'
+        )
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
 
     print(f"M3U8 file generated successfully: {filename}")
 